@@ -1,8 +1,128 @@
+import io
 import os
+from datetime import datetime, timezone
 import pandas as pd
 import requests
 from snowflake_io import insertVariantRows
 
+# football-data.co.uk publishes dates day-first, with 4- or 2-digit years
+DATE_FORMATS = ["%d/%m/%Y", "%d/%m/%y"]
+FIXTURE_COLUMNS = ["Date", "HomeTeam", "AwayTeam"]
+GOAL_COLUMNS = ["FTHG", "FTAG"]
+QUARANTINE_COLUMNS = ["record", *FIXTURE_COLUMNS, *GOAL_COLUMNS, "reasons"]
+
+
+def parseMatchDates(dates: pd.Series) -> pd.Series:
+    """
+    Parse football-data day-first dates, trying each known format in turn.
+
+    Parameters
+    ----------
+    dates : pandas.Series
+        Raw `Date` column.
+
+    Returns
+    -------
+    pandas.Series
+        Parsed dates, `NaT` where no format matches.
+    """
+    dates = dates.astype("string").str.strip()
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    for fmt in DATE_FORMATS:
+        missing = parsed.isna()
+        parsed[missing] = pd.to_datetime(dates[missing], format=fmt, errors="coerce")
+    return parsed
+
+
+def validateMatches(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Split match rows into clean rows and quarantined rows.
+
+    All checks run column-wise over the whole batch:
+        - `Date` parses in a football-data day-first format
+        - `HomeTeam` and `AwayTeam` are present
+        - `FTHG` and `FTAG` are non-negative integers
+        - (Date, HomeTeam, AwayTeam) is not a duplicate of an earlier row
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Match rows as read from the CSV.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, pandas.DataFrame]
+        Clean rows and quarantined rows (`QUARANTINE_COLUMNS`, with
+        `;`-separated failure reasons). Clean rows keep their original
+        columns, with `Date` normalized to ISO `YYYY-MM-DD`, team names
+        stripped and goals as integers, so STG reads exactly the values
+        that were validated.
+    """
+    checked = df.reindex(columns=df.columns.union(FIXTURE_COLUMNS + GOAL_COLUMNS, sort=False))
+    matchDates = parseMatchDates(checked["Date"])
+    checks = {"invalid_date": matchDates.isna()}
+
+    teams = {}
+    for column in ["HomeTeam", "AwayTeam"]:
+        teams[column] = checked[column].astype("string").str.strip()
+        checks[f"missing_{column}"] = teams[column].isna() | (teams[column] == "")
+
+    goals = {}
+    for column in GOAL_COLUMNS:
+        goals[column] = pd.to_numeric(checked[column], errors="coerce")
+        checks[f"invalid_{column}"] = ~((goals[column] >= 0) & (goals[column] % 1 == 0))
+
+    failed = pd.concat(checks, axis=1)
+    fixtureKey = pd.DataFrame(
+        {"Date": matchDates, "HomeTeam": teams["HomeTeam"], "AwayTeam": teams["AwayTeam"]}
+    )
+    # Only rows that passed every other check can claim a fixture first
+    failed["duplicate_fixture"] = ~failed.any(axis=1) & fixtureKey.where(
+        ~failed.any(axis=1)
+    ).duplicated(keep="first")
+
+    isBad = failed.any(axis=1)
+    # bool x str dot product concatenates the names of the failed checks
+    reasons = failed[isBad].dot(failed.columns + ";").astype("string").str.rstrip(";")
+
+    quarantined = checked.loc[isBad, FIXTURE_COLUMNS + GOAL_COLUMNS].copy()
+    # 1-based record position in the parsed CSV, not a file line number
+    quarantined.insert(0, "record", quarantined.index + 1)
+    quarantined["reasons"] = reasons
+
+    cleanDf = df.loc[~isBad].copy()
+    cleanDf["Date"] = matchDates[~isBad].dt.strftime("%Y-%m-%d")
+    cleanDf["HomeTeam"] = teams["HomeTeam"][~isBad].astype(object)
+    cleanDf["AwayTeam"] = teams["AwayTeam"][~isBad].astype(object)
+    for column in GOAL_COLUMNS:
+        cleanDf[column] = goals[column][~isBad].astype("int64")
+
+    return cleanDf, quarantined[QUARANTINE_COLUMNS]
+
+
+def writeQuarantine(quarantined: pd.DataFrame, source: str) -> str:
+    """
+    Write quarantined rows to a local CSV under `QUARANTINE_DIR`.
+
+    Parameters
+    ----------
+    quarantined : pandas.DataFrame
+        Output of `validateMatches`.
+    source : str
+        Short name used as the file prefix (e.g. 'csv_matches').
+
+    Returns
+    -------
+    str
+        Path of the written file.
+    """
+    quarantineDir = os.environ.get("QUARANTINE_DIR", "quarantine")
+    os.makedirs(quarantineDir, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = os.path.join(quarantineDir, f"{source}_{stamp}.csv")
+    quarantined.to_csv(path, index=False)
+    return path
+
 
 def ingestCsvMatches():
     """
@@ -12,8 +132,13 @@ def ingestCsvMatches():
     `FOOTBALLCSV_URL`. If the URL is invalid or returns a non-200 status code,
     the function raises a RuntimeError with a helpful message.
 
+    Rows are validated before upload (see `validateMatches`). Rows that fail
+    are written to a local quarantine file with their reasons and are not
+    uploaded.
+
     Expected environment variables:
         - FOOTBALLCSV_URL
+        - QUARANTINE_DIR (optional, defaults to 'quarantine')
 
     Target table:
         - FWA.RAW.CSV_MATCHES
@@ -27,9 +152,15 @@ def ingestCsvMatches():
             "Fix: update FOOTBALLCSV_URL in your .env to a valid CSV location."
         )
 
-    # pandas can read directly from URL, but we already validated it above
-    df = pd.read_csv(csvUrl)
-    records = df.fillna("").to_dict(orient="records")
+    # Parse the body we already downloaded instead of fetching the URL again
+    df = pd.read_csv(io.BytesIO(response.content))
+
+    cleanDf, quarantined = validateMatches(df)
+    if not quarantined.empty:
+        path = writeQuarantine(quarantined, source="csv_matches")
+        print(f"Quarantined {len(quarantined)} of {len(df)} rows -> {path}")
+
+    records = cleanDf.fillna("").to_dict(orient="records")
 
     insertVariantRows(
         tableFqn="FWA.RAW.CSV_MATCHES",
@@ -2,7 +2,7 @@ USE DATABASE FWA;
 
 CREATE OR REPLACE TABLE STG.MATCHES AS
 SELECT
-  TRY_TO_DATE(payload:Date::string)                 AS match_date,
+  TRY_TO_DATE(payload:Date::string, 'YYYY-MM-DD')   AS match_date,
   payload:HomeTeam::string                          AS home_team,
   payload:AwayTeam::string                          AS away_team,
   TRY_TO_NUMBER(payload:FTHG::string)               AS home_goals,
@@ -13,6 +13,6 @@ SELECT
   source                                            AS source,
   ingested_at                                       AS ingested_at
 FROM RAW.CSV_MATCHES
-WHERE TRY_TO_DATE(payload:Date::string) IS NOT NULL
+WHERE TRY_TO_DATE(payload:Date::string, 'YYYY-MM-DD') IS NOT NULL
   AND payload:HomeTeam::string IS NOT NULL
   AND payload:AwayTeam::string IS NOT NULL;
\ No newline at end of file
@@ -0,0 +1,587 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+import snowflake.connector
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SQL_DIR = ROOT_DIR / "sql"
+STATE_PATH = Path(__file__).resolve().parent / ".transformState.json"
+
+sys.path.insert(0, str(ROOT_DIR / "ingestion"))
+from snowflake_io import sfConnect  # noqa: E402
+
+# Files starting with this prefix (e.g. 01_init.sql) recreate the RAW layer
+# and belong to `make setup`, never to a transform run.
+SETUP_PREFIX = "0"
+
+IDENT = r"[A-Za-z_][\w$]*"
+# SCHEMA.TABLE, DB.SCHEMA.TABLE or DB..TABLE (PUBLIC schema); the lookarounds
+# stop a longer dotted name from matching only in part
+TABLE_REF = re.compile(rf"(?<![\w$.])({IDENT})(?:\.({IDENT})?)?\.({IDENT})(?![\w$.])")
+WRITE_PATTERN = re.compile(
+    r"^\s*(?:CREATE\s+(?:OR\s+REPLACE\s+)?"
+    r"(?:(?:LOCAL|GLOBAL|TRANSIENT|TEMPORARY|TEMP|VOLATILE|SECURE|RECURSIVE"
+    r"|DYNAMIC|MATERIALIZED)\s+)*(?:TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    r"|INSERT\s+(?:OVERWRITE\s+)?INTO\s+|MERGE\s+INTO\s+|UPDATE\s+"
+    r"|DELETE\s+FROM\s+|TRUNCATE\s+(?:TABLE\s+)?(?:IF\s+EXISTS\s+)?"
+    r"|ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?)",
+    re.IGNORECASE,
+)
+READ_ONLY_PATTERN = re.compile(
+    r"^\s*(?:SELECT|WITH|SET|UNSET|SHOW|DESC|DESCRIBE|ALTER\s+SESSION)\b",
+    re.IGNORECASE,
+)
+USE_PATTERN = re.compile(rf"^\s*USE\s+(DATABASE|SCHEMA)\s+({IDENT}(?:\.{IDENT})?)\s*$", re.IGNORECASE)
+LITERAL_PATTERN = re.compile(r"'(?:\\.|''|[^'\\])*'|\$\$.*?\$\$", re.DOTALL)
+SCHEMA_PATTERN = re.compile(rf"\bCREATE\s+SCHEMA\s+(?:IF\s+NOT\s+EXISTS\s+)?({IDENT})", re.IGNORECASE)
+
+
+def splitStatements(sqlText: str) -> list[str]:
+    """
+    Split a SQL script into individual statements.
+
+    Comments are replaced by whitespace. Semicolons inside quoted literals
+    (including backslash escapes), quoted identifiers and `$$` bodies are
+    ignored.
+
+    Parameters
+    ----------
+    sqlText : str
+        Contents of a `.sql` file.
+
+    Returns
+    -------
+    list[str]
+        Non-empty statements without the trailing semicolon.
+    """
+    statements, current = [], []
+    i, n = 0, len(sqlText)
+    quote = None
+
+    while i < n:
+        ch = sqlText[i]
+        if quote == "$$":
+            if sqlText.startswith("$$", i):
+                current.append("$$")
+                quote = None
+                i += 2
+                continue
+            current.append(ch)
+        elif quote:
+            current.append(ch)
+            if ch == "\\" and quote == "'" and i + 1 < n:
+                current.append(sqlText[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif sqlText.startswith("$$", i):
+            quote = "$$"
+            current.append("$$")
+            i += 2
+            continue
+        elif ch in ("'", '"'):
+            quote = ch
+            current.append(ch)
+        elif sqlText.startswith("--", i):
+            end = sqlText.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif sqlText.startswith("/*", i):
+            end = sqlText.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            current.append(" ")
+            continue
+        elif ch == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+
+    statements.append("".join(current).strip())
+    return [s for s in statements if s]
+
+
+def tableRefs(text: str, schemas: set[str]) -> list[tuple[int, str]]:
+    """
+    Find references to tables in the pipeline's schemas.
+
+    Only schema-qualified names are tables here; `alias.column` and other
+    dotted names whose schema is not a pipeline schema are ignored.
+
+    Returns
+    -------
+    list[tuple[int, str]]
+        Start offset and upper-case `SCHEMA.TABLE` key of each reference.
+    """
+    refs = []
+    for m in TABLE_REF.finditer(text):
+        if m.group(0).count(".") == 1:
+            schema, table = m.group(1), m.group(3)
+        else:
+            schema, table = m.group(2) or "PUBLIC", m.group(3)
+        if schema.upper() in schemas:
+            refs.append((m.start(), f"{schema}.{table}".upper()))
+    return refs
+
+
+def parseSqlFile(path: Path, schemas: set[str]) -> dict:
+    """
+    Parse a transform file into its statements and table lineage.
+
+    Tables must be written schema-qualified (`STG.MATCHES`), as every file in
+    `sql/` does. The table right after a CREATE, INSERT, MERGE, UPDATE,
+    DELETE, TRUNCATE or ALTER TABLE at the start of a statement is an output;
+    every other qualified reference (FROM lists, joins, CLONE/LIKE sources,
+    subqueries) is an input.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        Path to a `.sql` file.
+    schemas : set[str]
+        Upper-case pipeline schemas (see `discoverSchemas`).
+
+    Returns
+    -------
+    dict
+        Keys: `name`, `path`, `statements`, `inputs`, `outputs`, `sqlHash`.
+        `inputs` excludes tables the file writes itself.
+
+    Raises
+    ------
+    RuntimeError
+        On `USE SCHEMA`, an unqualified write target, or a statement that is
+        neither a known write nor read-only, so a dependency is never guessed.
+    """
+    sqlText = path.read_text(encoding="utf-8")
+    statements = splitStatements(sqlText)
+    inputs, outputs = set(), set()
+
+    for statement in statements:
+        use = USE_PATTERN.match(statement)
+        if use:
+            if use.group(1).upper() == "SCHEMA":
+                raise RuntimeError(
+                    f"{path.name}: USE SCHEMA is not supported in transform files. "
+                    "Fix: qualify table names as SCHEMA.TABLE."
+                )
+            continue
+
+        lineageText = LITERAL_PATTERN.sub("''", statement)
+        refs = tableRefs(lineageText, schemas)
+        write = WRITE_PATTERN.match(lineageText)
+        if write:
+            target = [table for start, table in refs if start == write.end()]
+            if not target:
+                raise RuntimeError(
+                    f"{path.name}: cannot resolve write target in "
+                    f"'{lineageText[:write.end() + 40].strip()}'. "
+                    "Fix: qualify it as SCHEMA.TABLE."
+                )
+            outputs.add(target[0])
+        elif not READ_ONLY_PATTERN.match(lineageText):
+            raise RuntimeError(
+                f"{path.name}: unsupported statement '{lineageText[:40].strip()}...'."
+            )
+        inputs.update(table for start, table in refs if not write or start != write.end())
+
+    return {
+        "name": path.name,
+        "path": path,
+        "statements": statements,
+        "inputs": inputs - outputs,
+        "outputs": outputs,
+        "sqlHash": hashlib.sha256(sqlText.encode("utf-8")).hexdigest(),
+    }
+
+
+def buildDag(nodes: list[dict]) -> dict[str, set[str]]:
+    """
+    Derive node dependencies from table references.
+
+    A node depends on every node that writes one of its input tables. When
+    several files write the same table they are chained in filename order.
+
+    Parameters
+    ----------
+    nodes : list[dict]
+        Parsed nodes from `parseSqlFile`, sorted by filename.
+
+    Returns
+    -------
+    dict[str, set[str]]
+        Mapping of node name to the names of its upstream nodes.
+
+    Raises
+    ------
+    RuntimeError
+        If the references form a cycle.
+    """
+    writers: dict[str, list[str]] = {}
+    for node in nodes:
+        for table in node["outputs"]:
+            writers.setdefault(table, []).append(node["name"])
+
+    upstream = {node["name"]: set() for node in nodes}
+    for node in nodes:
+        for table in node["inputs"]:
+            upstream[node["name"]].update(writers.get(table, []))
+    for names in writers.values():
+        for previous, current in zip(names, names[1:]):
+            upstream[current].add(previous)
+
+    remaining = {name: set(deps) for name, deps in upstream.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise RuntimeError(
+                f"Dependency cycle between SQL files: {', '.join(sorted(remaining))}"
+            )
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return upstream
+
+
+def discoverSchemas(sqlDir: Path = SQL_DIR) -> set[str]:
+    """
+    Return the pipeline schemas created by the setup files (RAW, STG, MART).
+    """
+    schemas = {"PUBLIC"}
+    for path in sqlDir.glob(f"{SETUP_PREFIX}*.sql"):
+        schemas.update(s.upper() for s in SCHEMA_PATTERN.findall(path.read_text(encoding="utf-8")))
+    return schemas
+
+
+def discoverNodes(sqlDir: Path = SQL_DIR) -> list[dict]:
+    """
+    Discover and parse every transform file in `sql/`, skipping setup files.
+    """
+    schemas = discoverSchemas(sqlDir)
+    return [
+        parseSqlFile(path, schemas)
+        for path in sorted(sqlDir.glob("*.sql"))
+        if not path.name.startswith(SETUP_PREFIX)
+    ]
+
+
+def loadState() -> dict:
+    """
+    Load the state of the previous run, or an empty state on first run.
+    """
+    if not STATE_PATH.exists():
+        return {"nodes": {}}
+    return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+
+
+def saveState(state: dict):
+    """
+    Persist run state (input fingerprints and per-node timings) to disk.
+    """
+    STATE_PATH.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+
+
+VERSIONS_QUERY = """
+    SELECT table_schema, table_name, last_altered
+    FROM INFORMATION_SCHEMA.TABLES
+    WHERE table_schema <> 'INFORMATION_SCHEMA'
+"""
+
+
+def versionsQuery(tables: set[str] | None = None) -> tuple[str, tuple]:
+    """
+    Build the `LAST_ALTERED` lookup, optionally limited to some `SCHEMA.TABLE` keys.
+
+    `LAST_ALTERED` moves on both DDL and DML, so it is a cheap change marker
+    that avoids scanning table contents.
+    """
+    if not tables:
+        return VERSIONS_QUERY, ()
+    placeholders = ", ".join(["%s"] * len(tables))
+    query = VERSIONS_QUERY + f"  AND table_schema || '.' || table_name IN ({placeholders})"
+    return query, tuple(sorted(tables))
+
+
+def versionsFromRows(rows) -> dict[str, str]:
+    """
+    Map `(schema, table, last_altered)` rows to `SCHEMA.TABLE` -> ISO timestamp.
+    """
+    return {
+        f"{schema}.{table}".upper(): lastAltered.isoformat()
+        for schema, table, lastAltered in rows
+    }
+
+
+def fetchTableVersions(conn) -> dict[str, str]:
+    """
+    Return the `LAST_ALTERED` timestamp of every table and view in the database.
+    """
+    with conn.cursor() as cur:
+        cur.execute(*versionsQuery())
+        return versionsFromRows(cur.fetchall())
+
+
+def isUpToDate(node: dict, previous: dict | None, versions: dict[str, str]) -> bool:
+    """
+    Decide whether a node can be skipped.
+
+    A node is up to date when its SQL is unchanged, all of its outputs exist
+    and none of its input tables changed since it last ran successfully.
+    """
+    if not previous or previous.get("sqlHash") != node["sqlHash"]:
+        return False
+    if any(table not in versions for table in node["outputs"]):
+        return False
+    recorded = previous.get("inputs", {})
+    return all(recorded.get(table) == versions.get(table) for table in node["inputs"])
+
+
+class NodeRun:
+    """
+    Execution state of one SQL file on a pooled session.
+
+    Statements run in order on a single session. `USE` statements are
+    executed synchronously so the session context is set before the next
+    submission; everything else is submitted with `execute_async` and polled.
+
+    `inputVersions` is snapshotted at dispatch, after all upstream nodes have
+    finished, so it reflects the data this node actually reads. The lookup is
+    submitted asynchronously like the statements, so it never blocks the
+    scheduler.
+    """
+
+    def __init__(self, node: dict, conn):
+        self.node = node
+        self.conn = conn
+        self.inputVersions: dict[str, str] = {}
+        self.versionsQueryId = None
+        self.started = False
+        self.cursor = conn.cursor()
+        self.pending = list(node["statements"])
+        self.queryIds: list[str] = []
+        self.activeQueryId = None
+        self.finished = False
+        self.error = None
+        self.startedAt = time.perf_counter()
+
+    def submitNext(self) -> bool:
+        """
+        Submit the next statement. Returns False once every statement is done.
+        """
+        while self.pending:
+            statement = self.pending.pop(0)
+            if USE_PATTERN.match(statement):
+                self.cursor.execute(statement)
+                continue
+            self.cursor.execute_async(statement)
+            self.activeQueryId = self.cursor.sfqid
+            self.queryIds.append(self.activeQueryId)
+            return True
+        self.activeQueryId = None
+        return False
+
+    def advance(self):
+        """
+        Check the active query and submit the next one once it completes.
+
+        Sets `finished` when the last statement succeeded, or `error` when a
+        statement failed.
+        """
+        try:
+            if not self.started:
+                self.started = True
+                if self.node["inputs"]:
+                    self.cursor.execute_async(*versionsQuery(self.node["inputs"]))
+                    self.activeQueryId = self.versionsQueryId = self.cursor.sfqid
+                    return
+            elif self.activeQueryId:
+                status = self.conn.get_query_status_throw_if_error(self.activeQueryId)
+                if self.conn.is_still_running(status):
+                    return
+                if self.activeQueryId == self.versionsQueryId:
+                    self.cursor.get_results_from_sfqid(self.versionsQueryId)
+                    self.inputVersions = versionsFromRows(self.cursor.fetchall())
+            self.finished = not self.submitNext()
+        except snowflake.connector.errors.Error as exc:
+            self.error = exc
+
+    def close(self):
+        """
+        Close the cursor and undo any `USE` so the pooled session can be reused.
+        """
+        if any(USE_PATTERN.match(statement) for statement in self.node["statements"]):
+            database = os.environ.get("SNOWFLAKE_DATABASE", "FWA")
+            try:
+                self.cursor.execute(f"USE DATABASE {database}")
+            except snowflake.connector.errors.Error as exc:
+                self.error = self.error or exc
+        self.cursor.close()
+
+
+def runTransforms(
+    maxSessions: int = 4,
+    force: bool = False,
+    dryRun: bool = False,
+    pollInterval: float = 0.5,
+):
+    """
+    Run every transform in `sql/` following its table-level dependency DAG.
+
+    Independent nodes run concurrently, each on a session from a pool of at
+    most `maxSessions` connections. Nodes whose SQL and upstream tables are
+    unchanged since their last successful run are skipped, unless `force`
+    is set. Per-node timings and input fingerprints are stored in
+    `transform/.transformState.json`.
+
+    Parameters
+    ----------
+    maxSessions : int
+        Maximum number of concurrent Snowflake sessions.
+    force : bool
+        Run every node regardless of previous state.
+    dryRun : bool
+        Print the DAG and exit without connecting to Snowflake.
+    pollInterval : float
+        Seconds between async query status checks.
+
+    Raises
+    ------
+    RuntimeError
+        If any node fails. Nodes downstream of a failure are not run.
+    """
+    nodes = {node["name"]: node for node in discoverNodes()}
+    upstream = buildDag(list(nodes.values()))
+
+    if dryRun:
+        for name in nodes:
+            deps = ", ".join(sorted(upstream[name])) or "-"
+            print(f"{name}  <-  {deps}")
+        return
+
+    state = loadState()
+    timings: dict[str, dict] = {}
+    done, blocked = set(), set()
+    ran: dict[str, dict[str, str]] = {}
+    failed = {}
+    waiting = list(nodes)
+    running: list[NodeRun] = []
+    idleSessions, sessions = [], []
+
+    try:
+        sessions.append(sfConnect())
+        idleSessions.append(sessions[0])
+        versions = fetchTableVersions(sessions[0])
+
+        while waiting or running:
+            for name in list(waiting):
+                deps = upstream[name]
+                if deps & blocked:
+                    waiting.remove(name)
+                    blocked.add(name)
+                    timings[name] = {"status": "blocked", "seconds": 0.0}
+                    continue
+                if not deps <= done:
+                    continue
+
+                node = nodes[name]
+                if not force and not deps & ran.keys() and isUpToDate(
+                    node, state["nodes"].get(name), versions
+                ):
+                    waiting.remove(name)
+                    done.add(name)
+                    timings[name] = {"status": "skipped", "seconds": 0.0}
+                    continue
+
+                if not idleSessions:
+                    if len(sessions) >= maxSessions:
+                        continue
+                    sessions.append(sfConnect())
+                    idleSessions.append(sessions[-1])
+
+                waiting.remove(name)
+                nodeRun = NodeRun(node, idleSessions.pop())
+                nodeRun.advance()
+                running.append(nodeRun)
+
+            for nodeRun in list(running):
+                if not (nodeRun.finished or nodeRun.error):
+                    nodeRun.advance()
+                if not (nodeRun.finished or nodeRun.error):
+                    continue
+
+                name = nodeRun.node["name"]
+                running.remove(nodeRun)
+                nodeRun.close()
+                if nodeRun.error:
+                    # The session context may be left half-switched; drop it
+                    sessions.remove(nodeRun.conn)
+                    nodeRun.conn.close()
+                else:
+                    idleSessions.append(nodeRun.conn)
+                timings[name] = {
+                    "status": "failed" if nodeRun.error else "ran",
+                    "seconds": round(time.perf_counter() - nodeRun.startedAt, 3),
+                    "queryIds": nodeRun.queryIds,
+                }
+                if nodeRun.error:
+                    failed[name] = nodeRun.error
+                    blocked.add(name)
+                else:
+                    done.add(name)
+                    ran[name] = nodeRun.inputVersions
+
+            if running:
+                time.sleep(pollInterval)
+    finally:
+        for conn in sessions:
+            conn.close()
+
+    finishedAt = datetime.now(timezone.utc).isoformat()
+    for name, inputVersions in ran.items():
+        node = nodes[name]
+        state["nodes"][name] = {
+            "sqlHash": node["sqlHash"],
+            "inputs": {table: inputVersions.get(table) for table in sorted(node["inputs"])},
+            "lastRunAt": finishedAt,
+        }
+    # A failed file may have left its outputs half-built; force a rebuild
+    for name in failed:
+        state["nodes"].pop(name, None)
+    state["lastRun"] = {"finishedAt": finishedAt, "timings": timings}
+    saveState(state)
+
+    for name in nodes:
+        timing = timings[name]
+        print(f"{timing['status']:>8}  {timing['seconds']:>8.3f}s  {name}")
+
+    if failed:
+        details = "\n".join(f"  - {name}: {error}" for name, error in failed.items())
+        raise RuntimeError(f"Transform failed for {len(failed)} file(s):\n{details}")
+
+
+def main():
+    """
+    Command-line entry point used by `make transform`.
+    """
+    parser = argparse.ArgumentParser(description="Run sql/ transforms as a DAG.")
+    parser.add_argument("--max-sessions", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="ignore previous run state")
+    parser.add_argument("--dry-run", action="store_true", help="print the DAG only")
+    args = parser.parse_args()
+
+    load_dotenv()
+    runTransforms(maxSessions=args.max_sessions, force=args.force, dryRun=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()